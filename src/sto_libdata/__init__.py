@@ -1,7 +1,10 @@
 from sto_libdata.connection.connection_handler import ConnectionHandler 
 from sto_libdata.connection.database_connection import init_engine
 from sto_libdata.dataframe_handling.pushable_dataframe import PushableDF, PushConfig
-from sto_libdata.dataframe_handling.normalization import NormalizationHandler
+from sto_libdata.dataframe_handling.normalization import (
+    NormalizationHandler,
+    TableExtraction,
+)
 from sto_libdata.dataframe_handling.shared import NamedDataFrame
 
-__all__ = ["ConnectionHandler", "init_engine", "PushableDF", "PushConfig", "NormalizationHandler", "NamedDataFrame"]
+__all__ = ["ConnectionHandler", "init_engine", "PushableDF", "PushConfig", "NormalizationHandler", "TableExtraction", "NamedDataFrame"]
@@ -1,3 +1,6 @@
+from itertools import chain
+from typing import Optional
+
 import pandas as pd
 from sqlalchemy import Connection, MetaData, Table, inspect
 
@@ -34,14 +37,32 @@ class ConnectionHandler:
 
         self.__dataframe_handler = DataFrameTypeHandler()
 
+        # Names of the tables and views of the schema, keyed by their casefolded
+        # form (identifiers are case-insensitive under the default collation).
+        # Fetched lazily and invalidated whenever this handler emits DDL.
+        self.__table_names: Optional[dict[str, str]] = None
+
     def __schema_exists(self, metadata: MetaData) -> bool:
         return self.__inspector.has_schema(str(metadata.schema))
 
-    def __table_exists(self, table: str) -> bool:
-        return self.__inspector.has_table(table_name=table, schema=self.__schema_name)
+    def __get_table_names(self) -> dict[str, str]:
+        if self.__table_names is None:
+            self.__table_names = {
+                name.casefold(): name
+                for name in chain(
+                    self.__inspector.get_table_names(schema=self.__schema_name),
+                    self.__inspector.get_view_names(schema=self.__schema_name),
+                )
+            }
+
+        return self.__table_names
+
+    def __invalidate_metadata_cache(self) -> None:
+        self.__table_names = None
+        self.__inspector.clear_cache()
 
-    def __column_exists(self, column: str, table: str) -> bool:
-        return column in self.__inspector.get_columns(table, schema=self.__schema_name)
+    def __table_exists(self, table: str) -> bool:
+        return table.casefold() in self.__get_table_names()
 
     def download_dataframe(self, table: str) -> pd.DataFrame:
         return pd.read_sql_table(
@@ -58,7 +79,7 @@ class ConnectionHandler:
         pdfs = _PushableDataframes(*should_create)
         pdfm = _PushableDataframesWithMetadata(self.__metadata, pdfs)
         pdfm.push(self.__con)
-        self.commit_changes()
+        self.__invalidate_metadata_cache()
 
     def __handle_if_exists(self, *pdf_data: _PushData) -> None:
         should_fail = [
@@ -101,6 +122,9 @@ class ConnectionHandler:
         Tries to infer types based on the column specified in the `coltypes`
         argument.
 
+        Dropping, creation and insertion of all the tables are committed
+        together, in a single transaction.
+
         Args:
             *pushable_dataframes: A variable number of PushableDataframes, with
                 configuration or not. If no configutarion is specified, the
@@ -137,6 +161,9 @@ class ConnectionHandler:
         self.commit_changes()
 
     def __drop_tables_no_check(self, *table_name: str) -> None:
+        if len(table_name) == 0:
+            return
+
         tables = [
             Table(name, self.__metadata, autoload_with=self.__con)
             for name in table_name
@@ -146,6 +173,8 @@ class ConnectionHandler:
         for table in tables:
             self.__metadata.remove(table)
 
+        self.__invalidate_metadata_cache()
+
     def drop_table(self, table_name: str) -> None:
         """Drops the specified table, checking first whether it exists."""
         if self.__table_exists(table_name):
@@ -155,6 +184,7 @@ class ConnectionHandler:
 
             self.commit_changes()
             self.__metadata.remove(table)
+            self.__invalidate_metadata_cache()
 
     def commit_changes(self) -> None:
         """Persist changes made to the database."""
@@ -1,14 +1,31 @@
 from dotenv import load_dotenv
 import os
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import URL, Engine, create_engine
 
 def _init_engine(host, database, user, password)->Engine:
 
-    driver="ODBC+DRIVER+18+for+SQL+Server"
-
-    connection_string_sqlalchemy = f"mssql+pyodbc://{user}:{password}@{host}/{database}?driver={driver}"
-
-    return create_engine(connection_string_sqlalchemy)
+    driver="ODBC Driver 18 for SQL Server"
+
+    # The host may come as "host:port", which URL.create does not parse.
+    port = None
+    if host is not None and ":" in host:
+        host, port = host.rsplit(":", 1)
+        port = int(port)
+
+    # URL.create escapes the credentials, unlike string interpolation.
+    connection_url = URL.create(
+        "mssql+pyodbc",
+        username=user,
+        password=password,
+        host=host,
+        port=port,
+        database=database,
+        query={"driver": driver},
+    )
+
+    # With fast_executemany, pyodbc prepares each INSERT once and sends the
+    # parameters of a whole chunk of rows in a single batch.
+    return create_engine(connection_url, fast_executemany=True)
 
 def init_engine()->Engine:
     load_dotenv()
@@ -1,18 +1,12 @@
+from typing import Any, Iterable, Optional
+
+import numpy as np
 import pandas as pd
-from pandas.api.types import (
-    is_bool_dtype,
-    is_datetime64_dtype,
-    is_float_dtype,
-    is_integer_dtype,
-    is_string_dtype,
-)
-from pandas.io.sql import Series
 from sqlalchemy import CHAR, DATE, DATETIME, Boolean, Float, Integer
 from sqlalchemy.types import String
 from sqlalchemy.types import TypeEngine as SQLType
 
 from sto_libdata.exceptions.exceptions import NormalizationError
-from concurrent.futures import ProcessPoolExecutor
 
 
 class PotentialCHAR(SQLType): ...
@@ -25,15 +19,38 @@ class UnknownType(SQLType): ...
 
 
 UndeterminedType = PotentialCHAR | PotentialDATE | UnknownType
+# For membership checks; none of these classes is ever subclassed.
+_UNDETERMINED_TYPES = frozenset({PotentialCHAR, PotentialDATE, UnknownType})
+
+# Column name prefixes and suffixes (see `__infer_by_name`) and the types
+# they determine.
+_PREFIX_MAP: dict[str, type[SQLType]] = {
+    "ID_": Integer,
+    "DS_": String,  # VARCHAR(MAX)
+    "TX_": PotentialCHAR,
+    "CO_": PotentialCHAR,
+    "SW_": Boolean,
+    "DA_": DATE,
+    "TS_": DATETIME,
+}
+
+_SUFFIX_MAP: dict[str, type[SQLType]] = {
+    "_EUR": Float,
+    "_USD": Float,
+}
+
+# dtype kinds (see `numpy.dtype.kind`) and the types they determine.
+_KIND_MAP: dict[str, type[SQLType]] = {
+    "b": Boolean,
+    "i": Integer,
+    "u": Integer,
+    "f": Float,
+    "M": PotentialDATE,
+    "O": PotentialCHAR,
+    "U": PotentialCHAR,
+    "S": PotentialCHAR,
+}
 
-def _infer_column_type(t: tuple[str, Series]) -> tuple[str, SQLType]:
-    return __infer_column_type(*t)
-
-
-def __infer_column_type(name: str, column: Series) -> tuple[str, SQLType]:
-    handler = DataFrameTypeHandler()
-
-    return name, handler.infer_SQL_type(column, name)
 
 class DataFrameTypeHandler:
     def __init__(self) -> None: ...
@@ -47,9 +64,7 @@ class DataFrameTypeHandler:
         string_column_normalization_data = (
             (
                 colname,
-                self.determine_string_column_normalization(
-                    pd.Series(df[colname]), colname
-                ),
+                self.determine_string_column_normalization(df[colname], colname),
             )
             for colname, coltype in coltypes.items()
             if isinstance(coltype, String)
@@ -79,86 +94,97 @@ class DataFrameTypeHandler:
 
         return True, ""
 
-    def infer_SQL_types(self, df: pd.DataFrame) -> dict[str, SQLType]:
+    def infer_SQL_types(
+        self, df: pd.DataFrame, columns: Optional[Iterable[str]] = None
+    ) -> dict[str, SQLType]:
+        """Infers the SQL type of the columns of `df`.
+
+        Args:
+            df: The dataframe.
+            columns: The columns whose type to infer. Defaults to all of them.
+                Columns are read one by one, so that `df` is never copied.
+        """
+        inferred_types = {}
+
+        items = df.items() if columns is None else ((c, df[c]) for c in columns)
 
-        names_and_columns = [(name, Series(df[name])) for name in df.columns]
+        for name, col in items:
+            col_name = str(name)
 
-        with ProcessPoolExecutor() as executor:
-            names_and_inferred_types = list(executor.map(
-                _infer_column_type,
-                names_and_columns
-            ))
+            inferred_type = self.__infer_by_name_and_dtype(
+                col_name, col.dtype, len(df) == 0
+            )
+            if type(inferred_type) in _UNDETERMINED_TYPES:
+                inferred_type = self.infer_SQL_type(col, col_name)
+
+            inferred_types[col_name] = inferred_type
 
-        return {name: inferred_type for (name, inferred_type) in names_and_inferred_types}
+        return inferred_types
 
     def infer_SQL_type(self, col: pd.Series, col_name: str) -> SQLType:
         inferred_type = self.__infer_by_name(col_name)
-        if not isinstance(inferred_type, UndeterminedType):
+        if type(inferred_type) not in _UNDETERMINED_TYPES:
             return inferred_type
 
         inferred_type = self.__infer_by_dtype(col)
-        if not isinstance(inferred_type, UndeterminedType):
+        if type(inferred_type) not in _UNDETERMINED_TYPES:
             return inferred_type
 
         inferred_type = self.__infer_by_value(inferred_type, col)
-        if not isinstance(inferred_type, UndeterminedType):
+        if type(inferred_type) not in _UNDETERMINED_TYPES:
             return inferred_type
 
         raise TypeError(f"Unable to infer type for column {col}")
 
+    def __infer_by_name_and_dtype(
+        self, column_name: str, dtype: Any, is_empty: bool
+    ) -> SQLType:
+        """Infers a type without looking at the values of the column.
+
+        Only numpy boolean and integer dtypes are resolved here, since they
+        cannot hold nulls. Anything else is left undetermined so that it goes
+        through `infer_SQL_type`.
+        """
+        inferred_type = self.__infer_by_name(column_name)
+        if type(inferred_type) not in _UNDETERMINED_TYPES or is_empty:
+            return inferred_type
+
+        if isinstance(dtype, np.dtype):
+            if dtype.kind == "b":
+                return Boolean()
+            elif dtype.kind in "iu":
+                return Integer()
+
+        return UnknownType()
+
     def __infer_by_name(self, column_name: str) -> SQLType:
         upper = column_name.upper()
         if upper == "DATE":
             return DATE()
 
-        prefix = f"{upper}_"[:3]
+        type_class = _PREFIX_MAP.get(f"{upper}_"[:3])
+        if type_class is not None:
+            return type_class()
 
-        match prefix:
-            case "ID_":
-                return Integer()
-            case "DS_":
-                return String()  # VARCHAR(MAX)
-            case "TX_" | "CO_":
-                return PotentialCHAR()
-            case "SW_":
-                return Boolean()
-            case "DA_":
-                return DATE()
-            case "TS_":
-                return DATETIME()
-            case _:
-                pass
-
-        suffix = upper[-4:]
-        if suffix == "_EUR" or suffix == "_USD":
-            return Float()
-        elif upper[-5:] == "COUNT":
+        type_class = _SUFFIX_MAP.get(upper[-4:])
+        if type_class is not None:
+            return type_class()
+        elif upper.endswith("COUNT"):
             return Integer()
 
         return UnknownType()
 
     def __infer_by_dtype(self, col: pd.Series) -> SQLType:
-        nonnull = pd.Series(col[col.isna() == False]) # noqa: E712
-
+        nonnull = col.dropna() if col.hasnans else col
 
         if len(nonnull) == 0:
             raise ValueError(
                 f"Trying to insert a completely null column!. Name: {col.name}"
             )
 
-        inferred_dtype = nonnull.infer_objects().dtype
-        if is_bool_dtype(inferred_dtype):
-            return Boolean()
-        elif is_integer_dtype(inferred_dtype):
-            return Integer()
-        elif is_float_dtype(inferred_dtype):
-            return Float()
-        elif is_datetime64_dtype(inferred_dtype):
-            return PotentialDATE()
-        elif is_string_dtype(inferred_dtype):
-            return PotentialCHAR()
-        else:
-            return UnknownType()
+        type_class = _KIND_MAP.get(nonnull.infer_objects().dtype.kind, UnknownType)
+
+        return type_class()
 
     def __infer_by_value(
         self, inferred_dtype: UndeterminedType, col: pd.Series
@@ -168,19 +194,28 @@ class DataFrameTypeHandler:
         return self.resolve_stringtype(col)
 
     def resolve_potential_date(self, col: pd.Series) -> SQLType:
-        for time_unit in ["hour", "minute", "second"]:
-            values = getattr(col.dt, time_unit)
-            if not (values.isna() | values == 0).all():
-                return DATETIME()
+        # Null timestamps count as midnight, so they do not force a DATETIME.
+        hours, minutes, seconds = (
+            getattr(col.dt, time_unit).to_numpy(dtype="int32", na_value=0)
+            for time_unit in ["hour", "minute", "second"]
+        )
+
+        if (hours | minutes | seconds).any():
+            return DATETIME()
 
         return DATE()
 
     def resolve_stringtype(self, col: pd.Series) -> SQLType:
-        as_strings = pd.Series(col[col.isna() == False].astype(str)) # noqa: E712
+        as_strings = (col.dropna() if col.hasnans else col).astype(str)
+
+        lengths = as_strings.str.len().to_numpy()
+        nonempty_lengths = lengths[lengths > 0]
 
-        lengths = as_strings.apply(len)
+        if nonempty_lengths.size == 0:
+            # Only empty strings. CHAR(0) is not a valid type.
+            return CHAR(1)
 
-        m, M = int(lengths[lengths > 0].min()), int(lengths.max())
+        m, M = int(nonempty_lengths.min()), int(lengths.max())
 
         if m == M:
             return CHAR(M)
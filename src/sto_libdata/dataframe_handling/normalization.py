@@ -1,6 +1,10 @@
 from collections import defaultdict
+from itertools import count
+from pathlib import Path
 from typing import Any, NamedTuple, Optional, cast
 
+import numpy as np
+import pandas as pd
 from sqlalchemy import ForeignKey
 from sqlalchemy.types import TypeEngine as SQLType
 
@@ -8,14 +12,67 @@ from sto_libdata.dataframe_handling.pushable_dataframe import PushableDF
 from .shared import DataFrame, NamedDataFrame
 
 
-class TableAndColumnName(NamedTuple):
-    table_name: str
-    column_name: str
+type TableColumnDictionary[T] = dict[str, dict[str, T]]
 
 
-type TableColumnDictionary[T] = dict[str, dict[str, T]]
-type ForeignKeyIndex = TableColumnDictionary[TableAndColumnName]
-type ForeignKeyInvertedIndex = TableColumnDictionary[set[TableAndColumnName]]
+class TableExtraction(NamedTuple):
+    """
+    Args:
+        columns: The set of columns from which to extract a new dataframe.
+        new_table_name: The name that the SQL table corresponding to the
+            newly created dataframe should have in the database.
+        new_column_name: The name that the column containing the foreign key
+            to the newly created table should have in the main table. If None,
+            it is derived from `new_table_name` (see
+            `NormalizationHandler.extract_new_table`).
+        sort: Whether to number the rows of the new table in the order of
+            its columns' values instead of in order of first appearance.
+    """
+    columns: set[str]
+    new_table_name: str
+    new_column_name: Optional[str] = None
+    sort: bool = False
+
+
+class _SpilledTable(NamedTuple):
+    """A handle to a table of the state that has been written to disk."""
+    path: Path
+    columns: pd.Index
+
+
+def _smallest_id_dtype(n_ids: int) -> type[np.signedinteger]:
+    """Narrowest integer dtype able to hold the IDs 1, ..., `n_ids`."""
+    for dtype in (np.int16, np.int32):
+        if n_ids <= np.iinfo(dtype).max:
+            return dtype
+
+    return np.int64
+
+
+def _first_occurrences(group_numbers: np.ndarray, sort: bool) -> np.ndarray:
+    """Finds the position of the first row of every group, in group order.
+
+    Args:
+        group_numbers: The group number of every row.
+        sort: Whether groups are numbered in sorted order. Otherwise, they
+            must be numbered in order of first appearance.
+    """
+    if sort:
+        return np.unique(group_numbers, return_index=True)[1]
+
+    # Numbered in order of appearance, a group first appears exactly where
+    # the running maximum of the group numbers grows.
+    running_max = np.maximum.accumulate(group_numbers)
+    is_first = np.empty(len(group_numbers), dtype=bool)
+    is_first[:1] = True
+    np.greater(running_max[1:], running_max[:-1], out=is_first[1:])
+
+    return np.flatnonzero(is_first)
+
+
+def _pack(table_id: int, column_id: int) -> int:
+    """Packs a table id and a column id into a single integer key."""
+    return (table_id << 32) | column_id
 
 
 class _ForeignKeyStateHandler:
@@ -25,13 +82,51 @@ class _ForeignKeyStateHandler:
     renaming of tables or columns by keeping an inverted index (not only
     where each foreign key points to, but also where each column is pointed
     from).
+
+    Foreign keys are stored column-wise: the i-th foreign key goes from
+    column `origin_columns[i]` of table `origin_tables[i]` to column
+    `destination_columns[i]` of table `destination_tables[i]`. Table and
+    column names are interned to integer ids, so renaming a table only
+    changes the name behind its id. Each foreign key is indexed by its
+    packed origin (see `_pack`), and each table by the foreign keys pointing
+    to it, so renaming a column only visits the foreign keys involving it.
     """
 
     def __init__(self) -> None:
-        self.__foreign_keys: ForeignKeyIndex = defaultdict(dict)
-        self.__inverted_index: ForeignKeyInvertedIndex = defaultdict(
-            lambda: defaultdict(set)
-        )
+        self.__table_ids: dict[str, int] = {}
+        self.__table_names: list[str] = []
+        self.__column_ids: dict[str, int] = {}
+        self.__column_names: list[str] = []
+
+        self.__origin_tables: list[int] = []
+        self.__origin_columns: list[int] = []
+        self.__destination_tables: list[int] = []
+        self.__destination_columns: list[int] = []
+
+        # Position of the foreign key going out of each packed origin, and
+        # positions of the foreign keys going out of/into each table.
+        self.__by_origin: dict[int, int] = {}
+        # Plain dicts, so that reading a missing table does not create it.
+        self.__by_origin_table: dict[int, list[int]] = {}
+        self.__by_destination_table: dict[int, list[int]] = {}
+
+        # "table.column" targets of the foreign keys, grouped by origin. Reset
+        # on every change.
+        self.__targets_cache: Optional[TableColumnDictionary[str]] = None
+
+    def __get_table_id(self, table: str) -> int:
+        if table not in self.__table_ids:
+            self.__table_ids[table] = len(self.__table_names)
+            self.__table_names.append(table)
+
+        return self.__table_ids[table]
+
+    def __get_column_id(self, column: str) -> int:
+        if column not in self.__column_ids:
+            self.__column_ids[column] = len(self.__column_names)
+            self.__column_names.append(column)
+
+        return self.__column_ids[column]
 
     def add_foreign_key(
         self,
@@ -40,154 +135,303 @@ class _ForeignKeyStateHandler:
         destination_table: str,
         destination_column: str,
     ) -> None:
-        self.__foreign_keys[origin_table][origin_column] = TableAndColumnName(
-            destination_table,
-            destination_column,
-        )
+        origin_id = self.__get_table_id(origin_table)
+        origin_column_id = self.__get_column_id(origin_column)
+        destination_id = self.__get_table_id(destination_table)
+        destination_column_id = self.__get_column_id(destination_column)
+
+        origin = _pack(origin_id, origin_column_id)
+        position = self.__by_origin.get(origin)
+
+        if position is None:
+            position = len(self.__origin_tables)
+            self.__origin_tables.append(origin_id)
+            self.__origin_columns.append(origin_column_id)
+            self.__destination_tables.append(destination_id)
+            self.__destination_columns.append(destination_column_id)
+            self.__by_origin[origin] = position
+            self.__by_origin_table.setdefault(origin_id, []).append(position)
+        else:
+            # The column already was a foreign key; make it point elsewhere.
+            self.__by_destination_table[self.__destination_tables[position]].remove(
+                position
+            )
+            self.__destination_tables[position] = destination_id
+            self.__destination_columns[position] = destination_column_id
 
-        self.__inverted_index[destination_table][destination_column].add(
-            TableAndColumnName(origin_table, origin_column)
-        )
+        self.__by_destination_table.setdefault(destination_id, []).append(position)
+        self.__targets_cache = None
 
     def rename_column(self, table: str, old_name: str, new_name: str) -> None:
-        if old_name in self.__foreign_keys[table].keys():
-            pointed_table, pointed_column = self.__foreign_keys[table].pop(old_name)
+        table_id = self.__table_ids.get(table)
+        old_id = self.__column_ids.get(old_name)
+        if table_id is None or old_id is None:
+            return
+
+        new_id = self.__get_column_id(new_name)
+
+        position = self.__by_origin.pop(_pack(table_id, old_id), None)
+        if position is not None:
+            self.__origin_columns[position] = new_id
+            self.__by_origin[_pack(table_id, new_id)] = position
+
+        for position in self.__by_destination_table.get(table_id, ()):
+            if self.__destination_columns[position] == old_id:
+                self.__destination_columns[position] = new_id
+
+        self.__targets_cache = None
+
+    def __merge_tables(self, from_id: int, into_id: int) -> None:
+        """Makes all foreign keys of table `from_id` belong to `into_id`."""
+        outgoing = self.__by_origin_table.pop(from_id, ())
+        for position in outgoing:
+            column_id = self.__origin_columns[position]
+            del self.__by_origin[_pack(from_id, column_id)]
+            self.__by_origin[_pack(into_id, column_id)] = position
+            self.__origin_tables[position] = into_id
+        self.__by_origin_table.setdefault(into_id, []).extend(outgoing)
+
+        incoming = self.__by_destination_table.pop(from_id, ())
+        for position in incoming:
+            self.__destination_tables[position] = into_id
+        self.__by_destination_table.setdefault(into_id, []).extend(incoming)
 
-            self.__foreign_keys[table][new_name] = TableAndColumnName(
-                pointed_table,
-                pointed_column,
-            )
+    def rename_table(self, old_name: str, new_name: str) -> None:
+        table_id = self.__table_ids.pop(old_name, None)
+        if table_id is None:
+            return
 
-            self.__replace_in_inverted_index(
-                pointed_table,
-                pointed_column,
-                TableAndColumnName(table, old_name),
-                TableAndColumnName(table, new_name),
-            )
+        # Only happens when overwriting a table that had foreign keys itself.
+        if (overwritten_id := self.__table_ids.get(new_name)) is not None:
+            self.__merge_tables(overwritten_id, table_id)
 
-        if old_name in self.__inverted_index[table].keys():
-            self.__inverted_index[table][new_name] = self.__inverted_index[table].pop(
-                old_name
-            )
+        self.__table_ids[new_name] = table_id
+        self.__table_names[table_id] = new_name
 
-        for affected_table, affected_column in self.__inverted_index[table][new_name]:
-            self.__foreign_keys[affected_table][affected_column] = TableAndColumnName(
-                table, new_name
-            )
+        self.__targets_cache = None
 
-    def rename_table(self, old_name: str, new_name: str) -> None:
-        if old_name in self.__foreign_keys.keys():
-            self.__foreign_keys[new_name] = self.__foreign_keys.pop(old_name)
-
-        for pointing_column, (pointed_table, pointed_column) in self.__foreign_keys[
-            new_name
-        ].items():
-            self.__replace_in_inverted_index(
-                pointed_table,
-                pointed_column,
-                TableAndColumnName(old_name, pointing_column),
-                TableAndColumnName(new_name, pointing_column),
-            )
+    def __get_targets(self) -> TableColumnDictionary[str]:
+        if self.__targets_cache is None:
+            targets: TableColumnDictionary[str] = {}
+            interned: dict[int, str] = {}
+            tables = self.__table_names
+            columns = self.__column_names
 
-        self.__inverted_index[new_name] = self.__inverted_index.pop(old_name)
-
-        for pointed_column, pointing_tables_and_columns in self.__inverted_index[
-            new_name
-        ].items():
-            for pointing_table, pointing_column in pointing_tables_and_columns:
-                self.__foreign_keys[pointing_table][pointing_column] = (
-                    TableAndColumnName(
-                        new_name,
-                        pointed_column,
-                    )
-                )
+            for pointing_table, pointing_column, pointed_table, pointed_column in zip(
+                self.__origin_tables,
+                self.__origin_columns,
+                self.__destination_tables,
+                self.__destination_columns,
+            ):
+                key = _pack(pointed_table, pointed_column)
+                if key not in interned:
+                    interned[key] = f"{tables[pointed_table]}.{columns[pointed_column]}"
 
-    def __replace_in_inverted_index(
-        self,
-        table: str,
-        column: str,
-        old_names: TableAndColumnName,
-        new_names: TableAndColumnName,
-    ) -> None:
-        self.__inverted_index[table][column] -= {old_names}
-        self.__inverted_index[table][column].add(new_names)
+                targets.setdefault(tables[pointing_table], {})[
+                    columns[pointing_column]
+                ] = interned[key]
+
+            self.__targets_cache = targets
+
+        return self.__targets_cache
 
     def get_foreign_keys(self) -> TableColumnDictionary[ForeignKey]:
-        return {
-            pointing_table: {
-                pointing_column: ForeignKey(f"{pointed_table}.{pointed_column}")
-                for pointing_column, (
-                    pointed_table,
-                    pointed_column,
-                ) in foreign_keys.items()
+        """Maps tables to their outgoing foreign keys.
+
+        Tables without outgoing foreign keys are mapped to an empty dictionary.
+
+        New ForeignKey objects are built on every call, since SQLAlchemy only
+        allows attaching each of them to a single column.
+        """
+        foreign_keys: TableColumnDictionary[ForeignKey] = defaultdict(dict)
+
+        for pointing_table, targets in self.__get_targets().items():
+            foreign_keys[pointing_table] = {
+                pointing_column: ForeignKey(target)
+                for pointing_column, target in targets.items()
             }
-            for pointing_table, foreign_keys in self.__foreign_keys.items()
-        }
+
+        return foreign_keys
 
 class NormalizationHandler:
     """An interface to normalize a single dataframe into separate tables."""
 
-    def __init__(self, *dataframes: NamedDataFrame) -> None:
+    def __init__(
+        self, *dataframes: NamedDataFrame, spill_dir: Optional[Path] = None
+    ) -> None:
+        """
+        Args:
+            *dataframes: The dataframes to normalize.
+            spill_dir: If set, the extracted tables are written as Parquet
+                files to this directory and only read back when needed (for
+                instance, by `to_pushable_dataframes`), so that they are not
+                held in memory. The dataframes passed to this handler stay
+                in memory. Requires a Parquet engine (e.g. pyarrow, installed
+                with the `parquet` extra).
+        """
         self.__original_named_dataframes = dataframes
+        self.__spill_dir = spill_dir
+        self.__spill_counter = count()
         self.__initialize_state(*dataframes)
 
     def __initialize_state(self, *dataframes: NamedDataFrame) -> None:
-        self.__table_state: dict[str, DataFrame] = {
+        self.__table_state: dict[str, DataFrame | _SpilledTable] = {
             named_df.name: named_df.df for named_df in dataframes
         }
         self.__foreign_key_handler = _ForeignKeyStateHandler()
 
     def reset_state(self) -> None:
-        self.__initialize_state(*self.__original_named_dataframes)
+        for name in list(self.__table_state.keys()):
+            self.__discard(name)
 
-    def get_state(self) -> dict[str, DataFrame]:
-        """Fetches all of the dataframes that have been extracted so far."""
-        return self.__table_state
+        self.__initialize_state(*self.__original_named_dataframes)
 
-    def __extract_table(self, base: DataFrame, column_list: list[str]) -> DataFrame:
-        """Extracts and deduplicates a list of columns from a `base` dataset.
+    def get_state(self, copy: bool = False) -> dict[str, DataFrame]:
+        """Fetches all of the dataframes that have been extracted so far.
 
-        Does not mutate the base dataset.
+        Args:
+            copy: Whether to return copies of the dataframes. By default, the
+                internal state itself is returned, so mutating it (or the
+                dataframes in it) mutates this instance too. Tables spilled to
+                disk (see `spill_dir`) are always read back as new dataframes.
         """
-        new_table = base[column_list].dropna(how="all").drop_duplicates().copy()
+        if copy:
+            return {
+                name: self.__load(name).copy() for name in self.__table_state.keys()
+            }
 
-        new_table.reset_index(drop=True, inplace=True)
-        new_table["ID"] = new_table.index + 1
+        if self.__spill_dir is None:
+            # Nothing is ever spilled, so the state holds only dataframes.
+            return cast(dict[str, DataFrame], self.__table_state)
 
-        return cast(DataFrame, new_table)
+        return {name: self.__load(name) for name in self.__table_state.keys()}
 
-    def __replace_columns_by_fk(
-        self,
-        base: DataFrame,
-        dim: DataFrame,
-        join_columns: list[str],
-        fk_column_name: str,
-    ) -> DataFrame:
-        """Replaces a set of columns in `base` by a foreign key to `dim`.
-
-        This foreign key is computed by inner joining the two datasets on
-        `column_list`. Therefore, names in `column_list` should be present on
-        both dataframes.
-
-        Does not mutate any of the datasets.
+    def __load(self, name: str) -> DataFrame:
+        """Fetches the table `name` of the current state, reading it from disk
+        if it has been spilled.
+        """
+        table = self.__table_state[name]
+        if isinstance(table, _SpilledTable):
+            return pd.read_parquet(table.path)
+
+        return table
+
+    def __discard(self, name: str) -> None:
+        """Removes the table `name` from the current state, along with its
+        file if it has been spilled.
         """
+        table = self.__table_state.pop(name, None)
+        if isinstance(table, _SpilledTable):
+            table.path.unlink(missing_ok=True)
 
-        merged = base.merge(
-            dim,
-            on=join_columns,
-            suffixes=("", "___"),
-            how="left"
-        ).rename(
-            columns={"ID___": fk_column_name}
+    def __spill(self, df: DataFrame) -> _SpilledTable:
+        assert self.__spill_dir is not None
+
+        # Named by a counter alone: unique, so that renamed tables never
+        # clobber each other, and valid whatever the name of the table.
+        path = self.__spill_dir / f"{next(self.__spill_counter)}.parquet"
+        df.to_parquet(path, compression="zstd", index=False)
+
+        return _SpilledTable(path, df.columns)
+
+    def __publish(self, name: str, df: DataFrame, spill: bool = False) -> None:
+        """Stores `df` as the table `name` of the current state.
+
+        The dataframe is not copied, so it must not be referenced anywhere
+        else (for instance, by being a freshly built dataframe).
+
+        If this handler has a `spill_dir`, `df` is written to disk instead when
+        `spill` is set or when the table it replaces was already on disk.
+        """
+        spill = self.__spill_dir is not None and (
+            spill or isinstance(self.__table_state.get(name), _SpilledTable)
         )
+        self.__discard(name)
+
+        self.__table_state[name] = self.__spill(df) if spill else df
+
+    def __extract_columns(
+        self, base: DataFrame, column_list: list[str], sort: bool = False
+    ) -> tuple[DataFrame, np.ndarray | pd.arrays.IntegerArray]:
+        """Extracts a list of columns from a `base` dataset into a new table.
+
+        The new table holds the distinct rows of `column_list` (rows that are
+        null in all of them are ignored), numbered with an "ID" column in
+        order of first appearance, or sorted by `column_list` if `sort` is
+        set. Along with it, the foreign key from every row of `base` to said
+        ID is computed (null for ignored rows).
+
+        Both results come from a single grouping of the rows of `base`, so
+        that no join is needed to compute the foreign key.
+
+        Does not mutate the base dataset.
+
+        Returns:
+            The new table and the foreign key values, in this order.
+        """
+        if len(column_list) == 1:
+            # A single column can be factorized directly, without grouping.
+            column = column_list[0]
+            codes, uniques = pd.factorize(base[column], sort=sort)
+            all_null = codes == -1
+
+            new_table = pd.DataFrame({column: uniques})
+            ids = codes + 1
+        else:
+            keys = base[column_list]
+            all_null = np.zeros(len(base), dtype=bool)
+
+            # Key columns are usually dense, in which case there is no need
+            # to look for (and filter out) fully null rows.
+            if any(keys[column].hasnans for column in column_list):
+                all_null = keys.isna().all(axis=1).to_numpy()
+                keys = keys[~all_null]
+
+            group_numbers = (
+                keys.groupby(column_list, sort=sort, dropna=False, observed=True)
+                .ngroup()
+                .to_numpy()
+            )
+
+            new_table = keys.iloc[
+                _first_occurrences(group_numbers, sort)
+            ].reset_index(drop=True)
+
+            ids = np.zeros(len(base), dtype=np.intp)
+            ids[~all_null] = group_numbers + 1
+
+            self.__encode_repeated_strings(new_table)
 
-        all_columns = set(merged.columns)
+        id_dtype = _smallest_id_dtype(len(new_table))
 
-        columns_to_keep = list(all_columns - set(join_columns))
+        new_table["ID"] = np.arange(1, len(new_table) + 1, dtype=id_dtype)
+        ids = ids.astype(id_dtype, copy=False)
 
-        merged = cast(DataFrame, merged[columns_to_keep])
+        foreign_key = pd.arrays.IntegerArray(ids, all_null) if all_null.any() else ids
 
-        return merged
+        return new_table, foreign_key
+
+    def __encode_repeated_strings(self, table: DataFrame) -> None:
+        """Dictionary-encodes the string columns of `table` whose values are
+        mostly repeated, by turning them into categoricals.
+
+        Other object columns (e.g. nullable booleans or integers) are left
+        alone, so that their SQL type can still be inferred from their values.
+
+        Only worth it for tables extracted from several columns: the rows
+        are distinct as a whole, but each column alone may not be (e.g. a
+        country next to each one of its regions).
+
+        Mutates the table.
+        """
+        for column in table.columns:
+            values = table[column]
+            if (
+                values.dtype == object
+                and 2 * values.nunique(dropna=False) <= len(values)
+                and pd.api.types.infer_dtype(values, skipna=True) == "string"
+            ):
+                table[column] = values.astype("category")
 
     def extract_new_table(
         self,
@@ -195,6 +439,7 @@ class NormalizationHandler:
         columns: set[str],
         new_table_name: str,
         new_column_name: Optional[str] = None,
+        sort: bool = False,
     ) -> None:
         """Extracts a new table from a set of columns of the main dataframe.
 
@@ -217,29 +462,95 @@ class NormalizationHandler:
                 to the newly created table should have in the main table. If
                 None, a custom heuristic is used to extract the name: remove,
                 if any, the prefix of `new_table_name` and prepend "ID_" to it.
+            sort: Whether to sort the new table by `columns` (and number its
+                rows in that order). By default, rows are kept in order of
+                first appearance.
+        """
+        self.extract_new_tables(
+            from_table,
+            TableExtraction(columns, new_table_name, new_column_name, sort),
+        )
+
+    def extract_new_tables(
+        self, from_table: str, *extractions: TableExtraction
+    ) -> None:
+        """Extracts several new tables from the same table at once.
+
+        Equivalent to calling `extract_new_table` once for every extraction,
+        but `from_table` is rebuilt only once, with all of the extracted
+        columns replaced by their foreign keys at the same time.
+
+        Args:
+            from_table: The table from which to extract the columns.
+            *extractions: The columns to extract and the names of the resulting
+                table and foreign key column (see `extract_new_table`). No
+                column may appear in more than one extraction, and no two
+                extractions may produce the same table or foreign key column.
+                Foreign key columns may not be named like a column that remains
+                in `from_table`.
         """
-        if new_column_name is None:
-            new_column_name = f"ID_{new_table_name.split('_', 1)[-1]}"
+        extracted_columns = [
+            column for extraction in extractions for column in extraction.columns
+        ]
+        if len(set(extracted_columns)) != len(extracted_columns):
+            raise ValueError("The same column cannot be extracted more than once!")
+
+        new_table_names = [extraction.new_table_name for extraction in extractions]
+        if len(set(new_table_names)) != len(new_table_names):
+            raise ValueError("The same table cannot be extracted more than once!")
+
+        new_column_names = [
+            extraction.new_column_name
+            if extraction.new_column_name is not None
+            else f"ID_{extraction.new_table_name.split('_', 1)[-1]}"
+            for extraction in extractions
+        ]
+        if len(set(new_column_names)) != len(new_column_names):
+            raise ValueError(
+                "The same foreign key column cannot be created more than once!"
+            )
 
-        column_list = list(columns)
+        base_df = self.__load(from_table)
 
-        base_df = self.__table_state[from_table]
+        remaining_columns = set(base_df.columns).difference(extracted_columns)
+        if clashing := remaining_columns.intersection(new_column_names):
+            raise ValueError(f"{clashing} are already columns of {from_table}!")
 
-        new_table = self.__extract_table(base_df, column_list)
+        new_tables: dict[str, DataFrame] = {}
+        foreign_keys: dict[str, tuple[str, Any]] = {}
 
-        substituted_table = self.__replace_columns_by_fk(
-            base_df, new_table, column_list, new_column_name
-        )
+        for (columns, new_table_name, _, sort), new_column_name in zip(
+            extractions, new_column_names
+        ):
+            # Columns in the order of the base table rather than the (random)
+            # one of the set, which also decides the sort order.
+            column_list = [column for column in base_df.columns if column in columns]
+            if len(column_list) != len(columns):
+                missing = set(columns).difference(column_list)
+                raise KeyError(f"{missing} are not columns of {from_table}!")
 
-        self.__table_state[from_table] = substituted_table.copy()
-        self.__table_state[new_table_name] = new_table.copy()
+            new_table, foreign_key = self.__extract_columns(
+                base_df, column_list, sort
+            )
 
-        self.__foreign_key_handler.add_foreign_key(
-            from_table,
-            new_column_name,
-            new_table_name,
-            "ID",
-        )
+            new_tables[new_table_name] = new_table
+            foreign_keys[new_column_name] = (new_table_name, foreign_key)
+
+        substituted_table = base_df.drop(columns=extracted_columns)
+        for new_column_name, (_, foreign_key) in foreign_keys.items():
+            substituted_table[new_column_name] = foreign_key
+
+        self.__publish(from_table, substituted_table)
+        for new_table_name, new_table in new_tables.items():
+            self.__publish(new_table_name, new_table, spill=True)
+
+        for new_column_name, (new_table_name, _) in foreign_keys.items():
+            self.__foreign_key_handler.add_foreign_key(
+                from_table,
+                new_column_name,
+                new_table_name,
+                "ID",
+            )
 
     def __assert_table_existence(self, name: str) -> None:
         if name not in self.__table_state.keys():
@@ -263,7 +574,9 @@ class NormalizationHandler:
 
         self.__assert_table_existence(old_name)
 
-        self.__table_state[new_name] = self.__table_state.pop(old_name)
+        table = self.__table_state.pop(old_name)
+        self.__discard(new_name)
+        self.__table_state[new_name] = table
         self.__foreign_key_handler.rename_table(old_name, new_name)
 
     def rename_column(self, table: str, old_name: str, new_name: str) -> None:
@@ -278,8 +591,8 @@ class NormalizationHandler:
 
         self.__assert_column_existence(table, old_name)
 
-        self.__table_state[table] = self.__table_state[table].rename(
-            columns={old_name: new_name}
+        self.__publish(
+            table, self.__load(table).rename(columns={old_name: new_name})
         )
 
         self.__foreign_key_handler.rename_column(table, old_name, new_name)
@@ -295,7 +608,7 @@ class NormalizationHandler:
         foreign_keys: dict[str, ForeignKey],
     ) -> PushableDF:
         return PushableDF(
-            df=self.__table_state[entry_name],
+            df=self.__load(entry_name),
             table_name=entry_name,
             coltypes=coltypes,
             constraints=constraints,
@@ -322,14 +635,20 @@ class NormalizationHandler:
             A list of PushableDFs with correctly annotated foreign keys and
                 inferred column types.
         """
-        all_foreign_keys = self.get_foreign_keys()
+        # Merged once for all tables; user-given foreign keys take precedence.
+        merged_foreign_keys: TableColumnDictionary[ForeignKey] = {}
+        for source in (self.get_foreign_keys(), foreign_keys):
+            for table_name, table_foreign_keys in source.items():
+                merged_foreign_keys.setdefault(table_name, {}).update(
+                    table_foreign_keys
+                )
 
         return [
             self.__entry_to_pdf(
                 table_name,
                 coltypes.get(table_name, {}),
                 constraints.get(table_name, {}),
-                all_foreign_keys.get(table_name, {}) | foreign_keys.get(table_name, {}),
+                merged_foreign_keys.get(table_name, {}),
             )
             for table_name in self.__table_state.keys()
         ]
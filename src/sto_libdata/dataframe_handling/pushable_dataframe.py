@@ -62,6 +62,12 @@ class PushableDF:
         self.__constraints[primary_key]["primary_key"] = True
         self.__constraints[primary_key]["autoincrement"] = False
         self.__foreign_keys = foreign_keys
+        # Foreign keys are fixed from here on, so the referenced table names
+        # are parsed only once.
+        self.__referenced_tables = tuple(
+            fk.target_fullname.rsplit(".", 1)[0].split(".", 1)[-1]
+            for fk in self.__foreign_keys.values()
+        )
 
         self.__table: Optional[Table] = None
 
@@ -77,16 +83,22 @@ class PushableDF:
     def __infer_remaining_coltypes(
         self, specified: dict[str, SQLType]
     ) -> dict[str, SQLType]:
-        df_columns = set(str(col) for col in self.__df.columns)
+        # Lists rather than sets, so that the column order of the dataframe
+        # is kept in the table.
+        df_columns = [str(col) for col in self.__df.columns]
+
+        unspecified_columns = [col for col in df_columns if col not in specified]
 
-        specified_columns = set(specified.keys())
+        if len(unspecified_columns) == 0:
+            # Fast path: every type was given explicitly, nothing to infer.
+            return {col: specified[col] for col in df_columns}
 
         df_handler = DataFrameTypeHandler()
 
+        inferred = df_handler.infer_SQL_types(self.__df, unspecified_columns)
+
         return {
-            col: specified[col]
-            if col in specified_columns
-            else df_handler.infer_SQL_type(self.__df[col], col)
+            col: specified[col] if col in specified else inferred[col]
             for col in df_columns
         }
 
@@ -116,10 +128,7 @@ class PushableDF:
         return self.__table
 
     def get_foreign_keys(self) -> Iterator[str]:
-        return (
-            fk.target_fullname.rsplit(".", 1)[0].split(".", 1)[-1]
-            for fk in self.__foreign_keys.values()
-        )
+        return iter(self.__referenced_tables)
 
 
 class _PushableDataframes:
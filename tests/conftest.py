@@ -1,3 +0,0 @@
-import multiprocessing as mp
-
-mp.set_start_method("forkserver")
@@ -104,3 +104,22 @@ def test_table_and_column_renaming():
     }
 
     asssert_foreign_key_dicts_are_equal(output_fks, expected_fks)
+
+def test_renaming_tables_without_incoming_keys():
+    handler = _ForeignKeyStateHandler()
+
+    handler.add_foreign_key("FAC_VUELO", "ID_ORIGIN_AIRPORT", "DIM_AIRPORT", "ID")
+    handler.add_foreign_key("FAC_VUELO", "ID_DESTINATION_AIRPORT", "DIM_AIRPORT", "ID")
+
+    handler.rename_table("FAC_VUELO", "FAC_FLIGHT")
+
+    output_fks = handler.get_foreign_keys()
+
+    expected_fks = {
+        "FAC_FLIGHT": {
+            "ID_ORIGIN_AIRPORT": ForeignKey("DIM_AIRPORT.ID"),
+            "ID_DESTINATION_AIRPORT": ForeignKey("DIM_AIRPORT.ID")
+        },
+    }
+
+    asssert_foreign_key_dicts_are_equal(output_fks, expected_fks)
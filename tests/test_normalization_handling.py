@@ -2,11 +2,15 @@ import math
 from itertools import chain, repeat
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
+import pytest
+from sqlalchemy import Boolean, Integer
 
 from src.sto_libdata import NamedDataFrame
 from src.sto_libdata.dataframe_handling.normalization import (
     NormalizationHandler,
+    TableExtraction,
 )
 
 
@@ -64,6 +68,58 @@ def test_table_extraction():
     assert_dataframe_dict_equality(normhandler.get_state(), expected_output)
 
 
+def test_state_copying():
+    df = get_not_normalized_dataframe()
+
+    normhandler = NormalizationHandler(NamedDataFrame(df=df, name="MY_FAC_TABLE"))
+    normhandler.extract_new_table("MY_FAC_TABLE", {"TX_ES"}, "DIM_NAME")
+
+    copied_state = normhandler.get_state(copy=True)
+    copied_state["DIM_NAME"].loc[0, "TX_ES"] = "Nadie"
+    copied_state["MY_FAC_TABLE"]["VAL"] = 0.0
+    del copied_state["DIM_NAME"]
+
+    state = normhandler.get_state()
+
+    assert set(state.keys()) == {"MY_FAC_TABLE", "DIM_NAME"}
+    assert state["DIM_NAME"].loc[0, "TX_ES"] == "Juan"
+    assert (state["MY_FAC_TABLE"]["VAL"] == 0.3).all()
+
+
+def test_id_dtypes():
+    df = pd.DataFrame(
+        {
+            "ID": list(range(40_000)),
+            "TX_ES": ["Juan", None] * 20_000,
+            "TX_CA": ["Joan", "Pere"] * 20_000,
+            "CO_ID": list(range(40_000)),
+            "TX_A": ["a", None, None, "b"] * 10_000,
+            "TX_B": ["c", "d", None, None] * 10_000,
+        }
+    )
+
+    normhandler = NormalizationHandler(NamedDataFrame(df=df, name="FAC"))
+    normhandler.extract_new_tables(
+        "FAC",
+        TableExtraction({"TX_ES"}, "DIM_ES"),
+        TableExtraction({"TX_CA"}, "DIM_CA"),
+        TableExtraction({"CO_ID"}, "DIM_CO"),
+        TableExtraction({"TX_A", "TX_B"}, "DIM_AB"),
+    )
+
+    state = normhandler.get_state()
+
+    # Narrowest integer type for the IDs, nullable only if some key is null
+    assert state["DIM_ES"]["ID"].dtype == np.int16
+    assert state["FAC"]["ID_ES"].dtype == pd.Int16Dtype()
+    assert state["DIM_CA"]["ID"].dtype == np.int16
+    assert state["FAC"]["ID_CA"].dtype == np.int16
+    assert state["DIM_CO"]["ID"].dtype == np.int32
+    assert state["FAC"]["ID_CO"].dtype == np.int32
+    assert state["DIM_AB"]["ID"].dtype == np.int16
+    assert state["FAC"]["ID_AB"].dtype == pd.Int16Dtype()
+
+
 def expand_n_times(n: int, o: Iterable) -> Iterable:
     return chain.from_iterable(repeat(el, n) for el in o)
 
@@ -159,6 +215,276 @@ def test_advanced_normalization():
     assert_dataframe_dict_equality(output_dataframes, expected_dataframes)
 
 
+def test_spilled_normalization(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    raw_df, normalized_df = get_dataframe_2()
+
+    normalization_handler = NormalizationHandler(
+        NamedDataFrame(df=raw_df, name="FAC_TABLE"), spill_dir=tmp_path
+    )
+
+    normalization_handler.extract_new_table(
+        "FAC_TABLE", {"COUNTRY_ES", "COUNTRY_CA"}, "DIM_PAIS"
+    )
+    normalization_handler.extract_new_table("FAC_TABLE", {"DAY"}, "DIM_DAY")
+
+    # Only the extracted tables are spilled
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # Rewritten (and thus spilled again) under a name that is not a valid path
+    normalization_handler.rename_table("DIM_PAIS", "DIM/PAIS")
+    normalization_handler.rename_column("DIM/PAIS", "COUNTRY_ES", "TX_ES")
+    normalization_handler.rename_column("DIM/PAIS", "TX_ES", "COUNTRY_ES")
+
+    normalization_handler.rename_table("DIM/PAIS", "DIM_COUNTRY")
+    normalization_handler.rename_column("FAC_TABLE", "ID_PAIS", "ID_COUNTRY")
+    normalization_handler.rename_column("DIM_DAY", "DAY", "TX_ES")
+
+    # Replaced files are cleaned up
+    assert len(list(tmp_path.iterdir())) == 2
+
+    expected_dataframes = {
+        "FAC_TABLE": normalized_df,
+        "DIM_DAY": pd.DataFrame(
+            {
+                "ID": list(range(1, 8)),
+                "TX_ES": [
+                    "Lunes",
+                    "Martes",
+                    "Miercoles",
+                    "Jueves",
+                    "Viernes",
+                    "Sábado",
+                    "Domingo",
+                ],
+            }
+        ),
+        "DIM_COUNTRY": pd.DataFrame(
+            {
+                "ID": [1, 2, 3, 4],
+                "COUNTRY_ES": ["España", "Portugal", "Francia", "Alemania"],
+                "COUNTRY_CA": ["Espanya", "Portugal", "França", "Alemanya"],
+            }
+        ),
+    }
+
+    assert_dataframe_dict_equality(
+        normalization_handler.get_state(), expected_dataframes
+    )
+
+    pdfs = normalization_handler.to_pushable_dataframes()
+    assert_dataframe_dict_equality(
+        {pdf.get_name(): pdf.get_dataframe() for pdf in pdfs}, expected_dataframes
+    )
+
+    normalization_handler.reset_state()
+    assert len(list(tmp_path.iterdir())) == 0
+
+
+def test_batch_normalization():
+    raw_df, normalized_df = get_dataframe_2()
+
+    weekday_df = pd.DataFrame(
+        {
+            "ID": list(range(1, 8)),
+            "DAY": [
+                "Lunes",
+                "Martes",
+                "Miercoles",
+                "Jueves",
+                "Viernes",
+                "Sábado",
+                "Domingo",
+            ],
+        }
+    )
+
+    country_df = pd.DataFrame(
+        {
+            "ID": [1, 2, 3, 4],
+            "COUNTRY_ES": ["España", "Portugal", "Francia", "Alemania"],
+            "COUNTRY_CA": ["Espanya", "Portugal", "França", "Alemanya"],
+        }
+    )
+
+    expected_dataframes = {
+        "FAC_TABLE": normalized_df,
+        "DIM_DAY": weekday_df,
+        "DIM_COUNTRY": country_df,
+    }
+
+    normalization_handler = NormalizationHandler(
+        NamedDataFrame(df=raw_df, name="FAC_TABLE")
+    )
+
+    normalization_handler.extract_new_tables(
+        "FAC_TABLE",
+        TableExtraction({"COUNTRY_ES", "COUNTRY_CA"}, "DIM_COUNTRY"),
+        TableExtraction({"DAY"}, "DIM_DAY"),
+    )
+
+    output_dataframes = normalization_handler.get_state()
+
+    assert_dataframe_dict_equality(output_dataframes, expected_dataframes)
+
+    assert set(normalization_handler.get_foreign_keys()["FAC_TABLE"].keys()) == {
+        "ID_COUNTRY",
+        "ID_DAY",
+    }
+
+
+def test_batch_normalization_name_clashes():
+    df = pd.DataFrame(
+        {
+            "ID": [1, 2, 3],
+            "A": ["x", "y", "x"],
+            "B": ["p", "p", "q"],
+            "ID_C": [7, 8, 9],
+        }
+    )
+
+    normalization_handler = NormalizationHandler(NamedDataFrame(df=df, name="FAC"))
+
+    with pytest.raises(ValueError):
+        normalization_handler.extract_new_tables(
+            "FAC",
+            TableExtraction({"A"}, "DIM_X"),
+            TableExtraction({"B"}, "DIM_X"),
+        )
+
+    with pytest.raises(ValueError):
+        normalization_handler.extract_new_tables(
+            "FAC",
+            TableExtraction({"A"}, "DIM_A", "ID_K"),
+            TableExtraction({"B"}, "DIM_B", "ID_K"),
+        )
+
+    with pytest.raises(ValueError):
+        normalization_handler.extract_new_table("FAC", {"A"}, "DIM_C")
+
+    # Failed extractions leave the state untouched
+    assert_dataframe_dict_equality(normalization_handler.get_state(), {"FAC": df})
+    assert len(normalization_handler.get_foreign_keys()) == 0
+
+
+def test_partially_repeated_rows_extraction():
+    # Rows sharing some, but not all, of the extracted values are distinct
+    df = pd.DataFrame(
+        {
+            "ID": [1, 2, 3, 4],
+            "A": ["x", "y", "x", "y"],
+            "B": ["p", "p", "p", "q"],
+        }
+    )
+
+    normalization_handler = NormalizationHandler(NamedDataFrame(df=df, name="FAC"))
+    normalization_handler.extract_new_table("FAC", {"A", "B"}, "DIM_AB")
+
+    state = normalization_handler.get_state()
+
+    expected_dim = pd.DataFrame(
+        {"ID": [1, 2, 3], "A": ["x", "y", "y"], "B": ["p", "p", "q"]}
+    )
+    expected_fac = pd.DataFrame({"ID": [1, 2, 3, 4], "ID_AB": [1, 2, 1, 3]})
+
+    assert_dataframe_equality(state["DIM_AB"], expected_dim, "DIM_AB")
+    assert_dataframe_equality(state["FAC"], expected_fac, "FAC")
+
+
+def test_repeated_strings_encoding():
+    df = pd.DataFrame(
+        {
+            "ID": list(range(6)),
+            "REGION": ["Mallorca", "Menorca", "Mallorca", "Cataluña", "Madrid", "Galicia"],
+            "COUNTRY": ["España"] * 6,
+        }
+    )
+
+    normalization_handler = NormalizationHandler(NamedDataFrame(df=df, name="FAC"))
+    normalization_handler.extract_new_table("FAC", {"REGION", "COUNTRY"}, "DIM_REGION")
+
+    region_df = normalization_handler.get_state()["DIM_REGION"]
+
+    expected_region_df = pd.DataFrame(
+        {
+            "ID": [1, 2, 3, 4, 5],
+            "REGION": ["Mallorca", "Menorca", "Cataluña", "Madrid", "Galicia"],
+            "COUNTRY": ["España"] * 5,
+        }
+    )
+
+    assert_dataframe_equality(region_df, expected_region_df, "DIM_REGION")
+    assert isinstance(region_df["COUNTRY"].dtype, pd.CategoricalDtype)
+    assert region_df["REGION"].dtype == object
+
+
+def test_sorted_extraction():
+    df = pd.DataFrame(
+        {
+            "ID": list(range(6)),
+            "COUNTRY": ["España", "España", "Francia", "España", "Alemania", None],
+            "REGION": ["Mallorca", "Cataluña", "Bretaña", "Mallorca", None, None],
+            "VAL": ["b", "a", "c", "b", "a", "c"],
+        }
+    )
+
+    normalization_handler = NormalizationHandler(NamedDataFrame(df=df, name="FAC"))
+    normalization_handler.extract_new_tables(
+        "FAC",
+        TableExtraction({"COUNTRY", "REGION"}, "DIM_REGION", sort=True),
+        TableExtraction({"VAL"}, "DIM_VAL", sort=True),
+    )
+
+    state = normalization_handler.get_state()
+
+    expected_fac = pd.DataFrame(
+        {
+            "ID": list(range(6)),
+            "ID_REGION": pd.array([3, 2, 4, 3, 1, pd.NA], dtype="Int16"),
+            "ID_VAL": [2, 1, 3, 2, 1, 3],
+        }
+    )
+    expected_region_df = pd.DataFrame(
+        {
+            "ID": [1, 2, 3, 4],
+            "COUNTRY": ["Alemania", "España", "España", "Francia"],
+            "REGION": [None, "Cataluña", "Mallorca", "Bretaña"],
+        }
+    )
+    expected_val_df = pd.DataFrame({"ID": [1, 2, 3], "VAL": ["a", "b", "c"]})
+
+    assert_dataframe_equality(state["FAC"].fillna(0), expected_fac.fillna(0), "FAC")
+    assert_dataframe_equality(
+        state["DIM_REGION"].fillna(""), expected_region_df.fillna(""), "DIM_REGION"
+    )
+    assert_dataframe_equality(state["DIM_VAL"], expected_val_df, "DIM_VAL")
+
+
+def test_repeated_non_strings_encoding():
+    # Nullable BIT and INT columns come as object columns from the database
+    df = pd.DataFrame(
+        {
+            "ID": list(range(6)),
+            "TX_ES": ["a", "b", "c", "d", "e", "f"],
+            "FLAG": pd.Series([True, False, None, True, False, None], dtype=object),
+            "NUM": pd.Series([1, 2, None, 1, 2, None], dtype=object),
+        }
+    )
+
+    normalization_handler = NormalizationHandler(NamedDataFrame(df=df, name="FAC"))
+    normalization_handler.extract_new_table(
+        "FAC", {"TX_ES", "FLAG", "NUM"}, "DIM_THING"
+    )
+
+    pdfs = normalization_handler.to_pushable_dataframes()
+    (dim_pdf,) = [pdf for pdf in pdfs if pdf.get_name() == "DIM_THING"]
+    coltypes = dim_pdf.get_coltypes()
+
+    assert isinstance(coltypes["FLAG"], Boolean)
+    assert isinstance(coltypes["NUM"], Integer)
+
+
 def get_dataframe_3() -> tuple[pd.DataFrame, pd.DataFrame]:
     ids = list(range(4 * 7))
     weekdays = [
@@ -79,3 +79,35 @@ def test_value_inference():
     assert_type_comparison(expected_types, inferred_types)
 
 
+def test_null_date_inference():
+    handler = DataFrameTypeHandler()
+    mock_df = pd.DataFrame({
+        "BAD_NAME1": [np.datetime64("2000-01-01"), None, np.datetime64("2002-01-01")],
+        "BAD_NAME2": [np.datetime64("2000-01-01 00:00:01"), None, np.datetime64("2002-01-01")],
+    })
+
+    expected_types = {
+        "BAD_NAME1": DATE(),
+        "BAD_NAME2": DATETIME(),
+    }
+
+    inferred_types = handler.infer_SQL_types(mock_df)
+
+    assert_type_comparison(expected_types, inferred_types)
+
+
+def test_empty_string_inference():
+    handler = DataFrameTypeHandler()
+    mock_df = pd.DataFrame({
+        "BAD_NAME1": ["", "", ""],
+        "BAD_NAME2": ["", None, ""],
+    })
+
+    expected_types = {
+        "BAD_NAME1": CHAR(1),
+        "BAD_NAME2": CHAR(1),
+    }
+
+    inferred_types = handler.infer_SQL_types(mock_df)
+
+    assert_type_comparison(expected_types, inferred_types)